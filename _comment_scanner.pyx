@@ -0,0 +1,133 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Single-pass comment scanner, a compiled drop-in for the regex engine used by
+comment_parsing.CommentParser.
+
+The scanner walks the UTF-8 encoded code once, left to right, and reproduces the
+(SKIP)|(KEEP) semantics of the regex patterns exactly: strings are consumed and
+dropped, comments are returned as byte slices.
+
+Build in place with:
+    cythonize -i _comment_scanner.pyx
+"""
+
+from libc.string cimport memchr
+
+# Flavours, mirroring the language groups in CommentParser._build_pattern
+cdef enum:
+    PYTHON = 0
+    C_STYLE = 1
+    JS = 2
+    PHP = 3
+
+# ASCII delimiters
+cdef enum:
+    NEWLINE = 10
+    DOUBLE_QUOTE = 34
+    HASH = 35
+    SINGLE_QUOTE = 39
+    STAR = 42
+    SLASH = 47
+    BACKSLASH = 92
+    BACKTICK = 96
+
+
+cdef inline Py_ssize_t _string_end(const unsigned char* p, Py_ssize_t i, Py_ssize_t n,
+                                   unsigned char quote) nogil:
+    # Offset just past the closing quote of the string opened at i, or -1 if unclosed.
+    # Same as q(?:\\.|[^q\\])*q: an escape never consumes a newline.
+    cdef Py_ssize_t j = i + 1
+    while j < n:
+        if p[j] == quote:
+            return j + 1
+        if p[j] == BACKSLASH:
+            if j + 1 >= n or p[j + 1] == NEWLINE:
+                return -1
+            j += 2
+        else:
+            j += 1
+    return -1
+
+
+cdef inline Py_ssize_t _line_end(const unsigned char* p, Py_ssize_t i, Py_ssize_t n) nogil:
+    # Offset of the next newline at or after i, or n. Same as .*?$ under re.MULTILINE.
+    cdef const unsigned char* hit = <const unsigned char*>memchr(p + i, NEWLINE, n - i)
+    return n if hit == NULL else hit - p
+
+
+cdef inline Py_ssize_t _block_end(const unsigned char* p, Py_ssize_t i, Py_ssize_t n,
+                                  unsigned char first, unsigned char last, int width) nogil:
+    # Offset just past the first closing delimiter at or after i, or -1 if unclosed.
+    # The delimiter is `first` followed by (width - 1) copies of `last` ("*/", '"""', "'''").
+    cdef Py_ssize_t j = i
+    cdef int k
+    while j + width <= n:
+        if p[j] == first:
+            k = 1
+            while k < width and p[j + k] == last:
+                k += 1
+            if k == width:
+                return j + width
+        j += 1
+    return -1
+
+
+cdef list _scan(bytes b, int flavour):
+    cdef const unsigned char* p = b
+    cdef Py_ssize_t n = len(b)
+    cdef Py_ssize_t i = 0
+    cdef Py_ssize_t end
+    cdef unsigned char c
+    cdef bint keep
+    cdef list comments = []
+
+    while i < n:
+        c = p[i]
+        end = -1
+        keep = False
+
+        if c == DOUBLE_QUOTE or c == SINGLE_QUOTE:
+            if flavour == PYTHON and i + 2 < n and p[i + 1] == c and p[i + 2] == c:
+                # Triple quotes: the strict string cannot match, so try the docstring
+                end = _block_end(p, i + 3, n, c, c, 3)
+                keep = True
+            else:
+                end = _string_end(p, i, n, c)
+        elif c == BACKTICK and flavour == JS:
+            end = _string_end(p, i, n, c)
+        elif c == HASH and (flavour == PYTHON or flavour == PHP):
+            end = _line_end(p, i, n)
+            keep = True
+        elif c == SLASH and flavour != PYTHON and i + 1 < n:
+            if p[i + 1] == SLASH:
+                end = _line_end(p, i, n)
+                keep = True
+            elif p[i + 1] == STAR:
+                end = _block_end(p, i + 2, n, STAR, SLASH, 2)
+                keep = True
+
+        if end < 0:
+            # Nothing matches here, same as the regex engine moving one character on
+            i += 1
+        else:
+            if keep:
+                comments.append(b[i:end])
+            i = end
+
+    return comments
+
+
+cpdef list scan_python(bytes b):
+    return _scan(b, PYTHON)
+
+
+cpdef list scan_c(bytes b):
+    return _scan(b, C_STYLE)
+
+
+cpdef list scan_js(bytes b):
+    return _scan(b, JS)
+
+
+cpdef list scan_php(bytes b):
+    return _scan(b, PHP)
@@ -0,0 +1,128 @@
+"""
+Numba build of the single-pass comment scanner in _comment_scanner.pyx.
+
+Used by comment_parsing.CommentParser when the Cython extension is not built but
+Numba is installed. The JIT'd loop only touches bytes; comments come back as
+(start, end) offsets and are sliced out in Python.
+"""
+
+import numpy as np
+from numba import njit
+
+# Flavours, mirroring the language groups in CommentParser._build_pattern
+PYTHON, C_STYLE, JS, PHP = 0, 1, 2, 3
+
+# ASCII delimiters
+NEWLINE = 10
+DOUBLE_QUOTE = 34
+HASH = 35
+SINGLE_QUOTE = 39
+STAR = 42
+SLASH = 47
+BACKSLASH = 92
+BACKTICK = 96
+
+
+@njit(cache=True)
+def _string_end(buf, i, n, quote):
+    # Offset just past the closing quote of the string opened at i, or -1 if unclosed.
+    j = i + 1
+    while j < n:
+        if buf[j] == quote:
+            return j + 1
+        if buf[j] == BACKSLASH:
+            if j + 1 >= n or buf[j + 1] == NEWLINE:
+                return -1
+            j += 2
+        else:
+            j += 1
+    return -1
+
+
+@njit(cache=True)
+def _line_end(buf, i, n):
+    # Offset of the next newline at or after i, or n.
+    while i < n and buf[i] != NEWLINE:
+        i += 1
+    return i
+
+
+@njit(cache=True)
+def _block_end(buf, i, n, first, last, width):
+    # Offset just past the first closing delimiter at or after i, or -1 if unclosed.
+    j = i
+    while j + width <= n:
+        if buf[j] == first:
+            k = 1
+            while k < width and buf[j + k] == last:
+                k += 1
+            if k == width:
+                return j + width
+        j += 1
+    return -1
+
+
+@njit(cache=True)
+def _scan(buf, flavour):
+    n = buf.shape[0]
+    # Every comment is at least one byte and is followed by a newline or another token
+    starts = np.empty(n // 2 + 1, dtype=np.int64)
+    ends = np.empty(n // 2 + 1, dtype=np.int64)
+    count = 0
+    i = 0
+
+    while i < n:
+        c = buf[i]
+        end = -1
+        keep = False
+
+        if c == DOUBLE_QUOTE or c == SINGLE_QUOTE:
+            if flavour == PYTHON and i + 2 < n and buf[i + 1] == c and buf[i + 2] == c:
+                end = _block_end(buf, i + 3, n, c, c, 3)
+                keep = True
+            else:
+                end = _string_end(buf, i, n, c)
+        elif c == BACKTICK and flavour == JS:
+            end = _string_end(buf, i, n, c)
+        elif c == HASH and (flavour == PYTHON or flavour == PHP):
+            end = _line_end(buf, i, n)
+            keep = True
+        elif c == SLASH and flavour != PYTHON and i + 1 < n:
+            if buf[i + 1] == SLASH:
+                end = _line_end(buf, i, n)
+                keep = True
+            elif buf[i + 1] == STAR:
+                end = _block_end(buf, i + 2, n, STAR, SLASH, 2)
+                keep = True
+
+        if end < 0:
+            i += 1
+        else:
+            if keep:
+                starts[count] = i
+                ends[count] = end
+                count += 1
+            i = end
+
+    return starts, ends, count
+
+
+def _slices(b: bytes, flavour: int) -> list[bytes]:
+    starts, ends, count = _scan(np.frombuffer(b, dtype=np.uint8), flavour)
+    return [b[s:e] for s, e in zip(starts[:count].tolist(), ends[:count].tolist())]
+
+
+def scan_python(b: bytes) -> list[bytes]:
+    return _slices(b, PYTHON)
+
+
+def scan_c(b: bytes) -> list[bytes]:
+    return _slices(b, C_STYLE)
+
+
+def scan_js(b: bytes) -> list[bytes]:
+    return _slices(b, JS)
+
+
+def scan_php(b: bytes) -> list[bytes]:
+    return _slices(b, PHP)
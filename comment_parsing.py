@@ -1,4 +1,45 @@
+import enum
 import re
+import sys
+
+try:
+    # Optional: the `regex` module, whose engine supports possessive quantifiers
+    import regex as _re
+    _POSSESSIVE = True
+except ImportError:
+    _re = re
+    # The stdlib engine supports them from Python 3.11 on
+    _POSSESSIVE = sys.version_info >= (3, 11)
+
+try:
+    # Optional: Hyperscan (Intel Hyperscan / Vectorscan) multi-literal prefilter
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    # Optional: compiled single-pass scanner, built with `cythonize -i _comment_scanner.pyx`
+    import _comment_scanner
+except ImportError:
+    try:
+        # Fallback: the same scanner JIT-compiled with Numba
+        import _comment_scanner_jit as _comment_scanner
+    except ImportError:
+        _comment_scanner = None
+
+class Lang(enum.IntEnum):
+    """
+    Languages supported by CommentParser. Callers in tight loops can pass these
+    directly to extract_comments instead of a language name.
+    """
+    PYTHON = 0
+    C = 1
+    CPP = 2
+    JAVA = 3
+    CSHARP = 4
+    JS = 5
+    GO = 6
+    PHP = 7
 
 class CommentParser:
     """
@@ -6,99 +47,216 @@ class CommentParser:
     using Regular Expressions.
     """
 
+    # Language names accepted by extract_comments (case-insensitive)
+    _LANG_MAP = {
+        'python': Lang.PYTHON,
+        'c': Lang.C, 'c++': Lang.CPP, 'java': Lang.JAVA, 'c#': Lang.CSHARP,
+        'js': Lang.JS, 'javascript': Lang.JS, 'go': Lang.GO,
+        'php': Lang.PHP,
+    }
+
     def __init__(self):
         # ------------------------------------------------------------------
         # Regex Component Definitions
         # ------------------------------------------------------------------
         
+        # String bodies never have to give characters back, so where the engine
+        # supports it they are matched possessively: an unclosed string fails
+        # without backtracking through its body.
+        star = "*+" if _POSSESSIVE else "*"
+
         # Matches double quoted strings: "..."
         # Handles escaped quotes: \"
-        self._double_quotes = r'"(?:\\.|[^"\\])*"'
+        self._double_quotes = rf'"(?:\\.|[^"\\]){star}"'
         
         # Matches single quoted strings/chars: '...'
-        self._single_quotes = r"'(?:\\.|[^'\\])*'"
+        self._single_quotes = rf"'(?:\\.|[^'\\]){star}'"
 
         # Strict versions for Python to avoid consuming start of triple quotes
         # These lookahead to ensure a quote is NOT followed by another quote (preventing ' matching start of ''')
-        self._double_quotes_strict = r'"(?!"")(?:\\.|[^"\\])*"'
-        self._single_quotes_strict = r"'(?!'')(?:\\.|[^'\\])*'"
+        self._double_quotes_strict = rf'"(?!"")(?:\\.|[^"\\]){star}"'
+        self._single_quotes_strict = rf"'(?!'')(?:\\.|[^'\\]){star}'"
         
         # Matches backtick strings (JS template literals, Go raw strings): `...`
-        self._backticks = r"`(?:\\.|[^`\\])*`"
+        self._backticks = rf"`(?:\\.|[^`\\]){star}`"
         
         # Python Triple Quotes (Double and Single)
         self._py_triple_double = r'"""[\s\S]*?"""'
         self._py_triple_single = r"'''[\s\S]*?'''"
 
         # Comment Patterns
-        self._slash_slash = r"//.*?$"       # // comment
-        self._slash_star = r"/\*[\s\S]*?\*/" # /* block comment */
+        # // comment and /* block comment */, with the shared leading slash factored
+        # out so the engine tests it once per position instead of once per alternative
+        self._slash_comment = r"/(?:/.*?$|\*[\s\S]*?\*/)"
         self._hash = r"#.*?$"               # # comment
 
-    def _get_pattern(self, language: str):
+        # ------------------------------------------------------------------
+        # Compiled Pattern Cache
+        # ------------------------------------------------------------------
+
+        # Supported languages and the builder of their (skippable, keepable) parts
+        self._dispatch = {
+            Lang.PYTHON: self._python_parts,
+            Lang.C: self._c_style_parts, Lang.CPP: self._c_style_parts,
+            Lang.JAVA: self._c_style_parts, Lang.CSHARP: self._c_style_parts,
+            Lang.JS: self._js_parts, Lang.GO: self._js_parts,
+            Lang.PHP: self._php_parts,
+        }
+
+        # Compile every supported language once, so repeated calls to
+        # extract_comments only pay for a tuple index.
+        self._patterns = tuple(self._build_pattern(lang) for lang in Lang)
+
+        # ------------------------------------------------------------------
+        # Comment Opener Prefilter
+        # ------------------------------------------------------------------
+
+        # Every comment a language keeps starts with one of these literals.
+        # A snippet containing none of them has no comments, so the regex
+        # pass can be skipped entirely.
+        python_openers = ['#', '"""', "'''"]
+        c_style_openers = ['//', '/*']
+        php_openers = ['//', '#', '/*']
+        self._openers = {
+            Lang.PYTHON: python_openers,
+            Lang.C: c_style_openers, Lang.CPP: c_style_openers,
+            Lang.JAVA: c_style_openers, Lang.CSHARP: c_style_openers,
+            Lang.JS: c_style_openers, Lang.GO: c_style_openers,
+            Lang.PHP: php_openers,
+        }
+
+        # With Hyperscan available, all openers are searched in a single
+        # vectorized pass instead of one substring scan per opener.
+        self._prefilters = {}
+        if hyperscan is not None:
+            for lang, openers in self._openers.items():
+                db = hyperscan.Database()
+                db.compile(
+                    expressions=[re.escape(opener).encode() for opener in openers],
+                    ids=list(range(len(openers))),
+                    elements=len(openers),
+                    flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(openers),
+                )
+                self._prefilters[lang] = (db, hyperscan.Scratch(db))
+
+        # ------------------------------------------------------------------
+        # Compiled Scanner
+        # ------------------------------------------------------------------
+
+        # When the Cython extension is built (or Numba is installed), it replaces the regex engine.
+        # It returns exactly the same comments, as UTF-8 byte slices.
+        self._scanners = {}
+        if _comment_scanner is not None:
+            self._scanners = {
+                Lang.PYTHON: _comment_scanner.scan_python,
+                Lang.C: _comment_scanner.scan_c, Lang.CPP: _comment_scanner.scan_c,
+                Lang.JAVA: _comment_scanner.scan_c, Lang.CSHARP: _comment_scanner.scan_c,
+                Lang.JS: _comment_scanner.scan_js, Lang.GO: _comment_scanner.scan_js,
+                Lang.PHP: _comment_scanner.scan_php,
+            }
+
+    def _python_parts(self):
+        # Python:
+        # Skip: "Standard" strings that are NOT triple quotes.
+        # Keep: Hash comments (#) AND Triple Quotes (Docstrings/Block Comments).
+
+        # Note: We use strict versions of single/double quotes in 'skippable' so they 
+        # don't match the first quote of a triple-quote sequence.
+        # e.g., ' matches the start of ''' if we aren't careful.
+        skippable = f"{self._double_quotes_strict}|{self._single_quotes_strict}"
+        keepable = f"{self._hash}|{self._py_triple_double}|{self._py_triple_single}"
+        return skippable, keepable
+
+    def _c_style_parts(self):
+        # C-Style:
+        # Skip: Double quotes, Single quotes (chars)
+        # Keep: // and /* ... */
+        skippable = f"{self._double_quotes}|{self._single_quotes}"
+        keepable = self._slash_comment
+        return skippable, keepable
+
+    def _js_parts(self):
+        # JS/Go:
+        # Skip: Double quotes, Single quotes, Backticks
+        # Keep: // and /* ... */
+        skippable = f"{self._double_quotes}|{self._single_quotes}|{self._backticks}"
+        keepable = self._slash_comment
+        return skippable, keepable
+
+    def _php_parts(self):
+        # PHP:
+        # Skip: Double quotes, Single quotes
+        # Keep: //, #, and /* ... */
+        skippable = f"{self._double_quotes}|{self._single_quotes}"
+        keepable = f"{self._slash_comment}|{self._hash}"
+        return skippable, keepable
+
+    def _build_pattern(self, lang: Lang):
         """
         Constructs a specific compiled regex pattern for the given language.
-        Returns a pattern with two groups: 
-        Group 1: Content to skip (Strings/Literals)
-        Group 2: Content to keep (Comments)
+        Returns a pattern with a single capturing group:
+        Non-capturing: Content to skip (Strings/Literals)
+        Group 1: Content to keep (Comments)
         """
-        lang = language.lower()
-
-        if lang == 'python':
-            # Python:
-            # Skip: "Standard" strings that are NOT triple quotes.
-            # Keep: Hash comments (#) AND Triple Quotes (Docstrings/Block Comments).
-            
-            # Note: We use strict versions of single/double quotes in 'skippable' so they 
-            # don't match the first quote of a triple-quote sequence.
-            # e.g., ' matches the start of ''' if we aren't careful.
-            skippable = f"{self._double_quotes_strict}|{self._single_quotes_strict}"
-            keepable = f"{self._hash}|{self._py_triple_double}|{self._py_triple_single}"
-            
-        elif lang in ['c', 'c++', 'java', 'c#']:
-            # C-Style:
-            # Skip: Double quotes, Single quotes (chars)
-            # Keep: // and /* ... */
-            skippable = f"{self._double_quotes}|{self._single_quotes}"
-            keepable = f"{self._slash_slash}|{self._slash_star}"
-            
-        elif lang in ['js', 'go', 'javascript']:
-            # JS/Go:
-            # Skip: Double quotes, Single quotes, Backticks
-            # Keep: // and /* ... */
-            skippable = f"{self._double_quotes}|{self._single_quotes}|{self._backticks}"
-            keepable = f"{self._slash_slash}|{self._slash_star}"
-            
-        elif lang == 'php':
-            # PHP:
-            # Skip: Double quotes, Single quotes
-            # Keep: //, #, and /* ... */
-            skippable = f"{self._double_quotes}|{self._single_quotes}"
-            keepable = f"{self._slash_slash}|{self._hash}|{self._slash_star}"
-            
-        else:
-            raise ValueError(f"Unsupported language: {language}")
+        skippable, keepable = self._dispatch[lang]()
 
-        # Combine into (SKIP)|(KEEP)
+        # Combine into (?:SKIP)|(KEEP)
+        # Only comments are captured, so findall returns them directly as strings
+        # (an empty string for every skipped literal).
         # flags=re.MULTILINE | re.DOTALL is handled during compilation/search usually, 
         # but here we embed patterns that handle newlines (like [\s\S]).
         # We use re.MULTILINE for $ anchor matching.
-        return re.compile(f"({skippable})|({keepable})", re.MULTILINE)
+        return _re.compile(f"(?:{skippable})|({keepable})", _re.MULTILINE)
+
+    def _lang_id(self, language) -> Lang:
+        """
+        Resolves a language name (or a Lang) to its Lang.
+        """
+        if isinstance(language, Lang):
+            return language
+        lang = self._LANG_MAP.get(language.lower())
+        if lang is None:
+            raise ValueError(f"Unsupported language: {language}")
+        return lang
 
-    def extract_comments(self, code: str, language: str) -> list[str]:
+    def _get_pattern(self, language):
+        """
+        Returns the precompiled regex pattern for the given language.
+        """
+        return self._patterns[self._lang_id(language)]
+
+    def _may_contain_comment(self, code: str, lang: Lang) -> bool:
+        """
+        Returns False only if the code contains no comment opener for the given language.
+        """
+        if lang not in self._prefilters:
+            return any(opener in code for opener in self._openers[lang])
+
+        db, scratch = self._prefilters[lang]
+        try:
+            # Stop at the first opener found
+            db.scan(code.encode("utf-8", "surrogatepass"),
+                    match_event_handler=lambda *_: True, scratch=scratch)
+        except hyperscan.ScanTerminated:
+            return True
+        return False
+
+    def extract_comments(self, code: str, language) -> list[str]:
         """
         Parses the code and returns a list of comments.
+        `language` is a language name (e.g. 'Python', 'c++') or a Lang.
         """
-        pattern = self._get_pattern(language)
-        comments = []
-
-        # re.finditer is efficient for large strings
-        for match in pattern.finditer(code):
-            # group(1) is skippable (strings), group(2) is the comment
-            if match.group(2):
-                comments.append(match.group(2))
-        
-        return comments
+        lang = self._lang_id(language)
+        if not self._may_contain_comment(code, lang):
+            return []
+
+        scanner = self._scanners.get(lang)
+        if scanner is not None:
+            return [comment.decode("utf-8", "surrogatepass")
+                    for comment in scanner(code.encode("utf-8", "surrogatepass"))]
+
+        # findall builds the list in C; skipped strings come back as empty strings
+        return [comment for comment in self._patterns[lang].findall(code) if comment]
 
 # ------------------------------------------------------------------
 # Usage Examples
@@ -1,10 +1,17 @@
+import logging
 import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 from magika import Magika
 
 from collections import Counter
 
 
+logger = logging.getLogger(__name__)
+
+
 PLID_FEATURES = {
     "Python": {
         "Keyword": {
@@ -126,6 +133,13 @@ PLID_FEATURES = {
     }
 }
 
+# Freeze the feature sets and intern their tokens, so membership tests against
+# interned token strings can short-circuit on identity.
+for _features in PLID_FEATURES.values():
+    _features["Keyword"] = frozenset(sys.intern(s) for s in _features["Keyword"])
+    _features["Operator"] = frozenset(sys.intern(s) for s in _features["Operator"])
+del _features
+
 MAGIKA2SEMEVAL = {
     "python": "Python",
     "cpp": "C++",
@@ -137,34 +151,75 @@ MAGIKA2SEMEVAL = {
     "javascript": "JS",
 }
 
+# Random fallback when Magika finds no SemEval language. There are exactly 8
+# languages, so 3 random bits index the tuple uniformly.
+_FALLBACK_LANGS = tuple(PLID_FEATURES)
+assert len(_FALLBACK_LANGS) == 8
+
+# Texts up to this many UTF-8 bytes are identified in a single Magika call
+SINGLE_PASS_MAX_BYTES = 4096
+
+
+def _char_start(text_b, i):
+    # Snap a byte offset forward past UTF-8 continuation bytes, so windows hold whole characters
+    while i < len(text_b) and (text_b[i] & 0xC0) == 0x80:
+        i += 1
+    return i
+
 
 class ProgrammingLanguageIdentifier:
     def __init__(self):
         self.features = PLID_FEATURES
+        self._lang_names = list(self.features)
+        # Inverted index: token -> ids of the languages listing it as a feature
+        self._kw_index = {}
+        self._op_index = {}
+        for lang_id, features in enumerate(self.features.values()):
+            for text in features["Keyword"]:
+                self._kw_index[text] = self._kw_index.get(text, ()) + (lang_id,)
+            for text in features["Operator"]:
+                self._op_index[text] = self._op_index.get(text, ()) + (lang_id,)
+        self._indices = {"Keyword": self._kw_index, "Operator": self._op_index}
 
     def identify(self, tokens):
-        feature_counter = Counter({lang: 0 for lang in self.features.keys()})
-        for lang, features in self.features.items():
-            for text_base in tokens:
-                text, base = text_base[0], text_base[1]
-                if (text in features["Keyword"]) and (base == "Keyword"):
-                    feature_counter[lang] += 1
-                if (text in features["Operator"]) and (base == "Operator"):
-                    feature_counter[lang] += 1
-        print(feature_counter)
-        return max(feature_counter, key=feature_counter.get)
+        counts = [0] * len(self._lang_names)
+        for text_base in tokens:
+            text, base = text_base[0], text_base[1]
+            index = self._indices.get(base)
+            if index is None:
+                continue
+            for lang_id in index.get(text, ()):
+                counts[lang_id] += 1
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("feature_counter=%r", Counter(dict(zip(self._lang_names, counts))))
+        return self._lang_names[max(range(len(counts)), key=counts.__getitem__)]
 
 
 class PlidWithMagika:
     def __init__(self):
         self.predictor = Magika()
+        # Batched inference over all segments, when the installed Magika offers it
+        self._identify_bytes_batch = getattr(self.predictor, "identify_bytes_batch", None)
+        self._magika_keys = frozenset(MAGIKA2SEMEVAL)
+
+    def _identify_segments(self, segments):
+        if self._identify_bytes_batch is not None:
+            results = self._identify_bytes_batch(segments)
+        else:
+            results = [self.predictor.identify_bytes(segment) for segment in segments]
+        return [result.output.label for result in results]
 
     def identify(self, text, n_segments=5, overlap_ratio=0.5):
         # Sweep through text with overlapping segments
         segment_labels = []
-        text_len = len(text)
-        if n_segments <= 1 or text_len == 0:
+        # Encode once and window over bytes
+        text_b = text.encode("utf-8")
+        text_len = len(text_b)
+        if text_len == 0:
             segment_labels = []
+        elif n_segments <= 1 or text_len <= SINGLE_PASS_MAX_BYTES:
+            # Short text: a single Magika call on the whole buffer, no windows
+            segment_labels = self._identify_segments([text_b])
         else:
             segment_length = max(1, text_len // n_segments)
             step = max(1, int(segment_length * (1 - overlap_ratio)))
@@ -172,12 +227,19 @@ class PlidWithMagika:
             # Guarantee we always cover the last region
             if (len(indices) < n_segments and text_len > segment_length) or (indices and (indices[-1] + segment_length < text_len)):
                 indices.append(text_len - segment_length)
-            for start in indices[:n_segments]:
-                end = start + segment_length
-                segment = text[start:end]
-                segment_label = self.predictor.identify_bytes(segment.encode("utf-8")).output.label
-                segment_labels.append(segment_label)
-        segment_labels = Counter(segment_labels).most_common(10)
-        segment_labels = [MAGIKA2SEMEVAL[label] for label, _ in segment_labels if label in list(MAGIKA2SEMEVAL.keys())]
-        segment_label = segment_labels[0] if len(segment_labels) > 0 else random.choice(list(PLID_FEATURES.keys()))
-        return segment_label
\ No newline at end of file
+            segments = [
+                text_b[_char_start(text_b, start):_char_start(text_b, start + segment_length)]
+                for start in indices[:n_segments]
+            ]
+            segment_labels = self._identify_segments(segments)
+        # Most frequent label that maps to a SemEval language
+        for label, _ in Counter(segment_labels).most_common():
+            if label in self._magika_keys:
+                return MAGIKA2SEMEVAL[label]
+        return _FALLBACK_LANGS[random.getrandbits(3)]
+
+    def identify_many(self, texts, n_segments=5, overlap_ratio=0.5, max_workers=None):
+        # Magika's ONNX inference releases the GIL, so documents are identified concurrently
+        identify = partial(self.identify, n_segments=n_segments, overlap_ratio=overlap_ratio)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(identify, texts))